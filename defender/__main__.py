@@ -3,6 +3,8 @@
 Main entry point for the defender application.
 Competition format: POST / with Content-Type: application/octet-stream
 Returns {"result": 0} for benign, {"result": 1} for malicious
+
+Production: gunicorn --preload --workers 2 --worker-class gthread --threads 2 -b 0.0.0.0:8080 defender.__main__:app
 """
 
 import os
@@ -14,10 +16,35 @@ root_dir = Path(__file__).parent
 if str(root_dir) not in sys.path:
     sys.path.insert(0, str(root_dir))
 
+
+def warmup():
+    """
+    Load the XGBoost booster and EMBER extractor up front. Under gunicorn --preload this runs
+    once in the master, so workers share the loaded state copy-on-write after fork.
+    """
+    try:
+        from defender.models.predict_xgb import load_booster, load_treelite_predictor
+        from defender.inference_service import _get_extractor
+        load_booster()
+        load_treelite_predictor()
+        _get_extractor()
+    except (Exception, SystemExit):
+        # Defer failures to request time, where scoring already defaults to benign
+        pass
+
+
 # Competition-compliant Flask webserver
 try:
     from flask import Flask, request, jsonify
+    from werkzeug.exceptions import RequestEntityTooLarge
     app = Flask(__name__)
+    # Bound upload size so a single request cannot exhaust memory/disk
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', str(256 * 1024 * 1024)))
+
+    @app.errorhandler(413)
+    def too_large(e):
+        # Keep the competition JSON format instead of Flask's HTML error page
+        return jsonify({"result": 0}), 413
 
     @app.route('/', methods=['POST'])
     def predict_route():
@@ -29,33 +56,24 @@ try:
         if request.content_type != 'application/octet-stream':
             return jsonify({"result": 0}), 400  # Default to benign on error
         
-        # Get raw bytes from request body
-        pe_bytes = request.get_data()
-        if not pe_bytes:
-            return jsonify({"result": 0}), 400  # Default to benign on error
-        
-        # Save to temporary file
-        import tempfile
-        fd, tmp_path = tempfile.mkstemp(suffix='.exe')
-        os.close(fd)
         try:
-            with open(tmp_path, 'wb') as f:
-                f.write(pe_bytes)
+            # Get raw bytes from request body (raises RequestEntityTooLarge past MAX_CONTENT_LENGTH)
+            pe_bytes = request.stream.read()
+            if not pe_bytes:
+                return jsonify({"result": 0}), 400  # Default to benign on error
             
-            from defender.inference_service import score_exe
-            res = score_exe(tmp_path)
+            from defender.inference_service import score_bytes
+            res = score_bytes(pe_bytes)
             # Return competition format: {"result": 0|1}
             return jsonify({"result": int(res["label"])})
+        except RequestEntityTooLarge:
+            return jsonify({"result": 0}), 413  # Default to benign on error
         except Exception as e:
             # Default to benign on any error (competition requirement)
             return jsonify({"result": 0}), 500
-        finally:
-            try:
-                os.remove(tmp_path)
-            except Exception:
-                pass
 
     def run_server():
+        warmup()
         # Competition requirement: listen on port 8080
         app.run(host='0.0.0.0', port=int(os.environ.get('PORT', '8080')))
 except Exception:
@@ -64,4 +82,7 @@ except Exception:
         print("Flask not available. Server not started.")
 
 if __name__ == "__main__":
-    run_server()
\ No newline at end of file
+    run_server()
+else:
+    # Imported as defender.__main__:app by gunicorn
+    warmup()
\ No newline at end of file
@@ -1,6 +1,20 @@
 import typing as _t
 
 
+# Legacy exception names expected by EMBER -> modern names under lief.lief_errors
+_LEGACY_TO_MODERN: tuple[tuple[str, str], ...] = (
+	("bad_format", "file_format_error"),
+	("bad_file", "file_error"),
+	("pe_error", "parsing_error"),
+	("parser_error", "parsing_error"),
+	("read_out_of_bound", "read_out_of_bound"),
+	("not_implemented", "not_implemented"),
+	("not_found", "file_not_found"),
+)
+
+_APPLIED = False
+
+
 def apply_ember_lief_shims() -> None:
 	"""
 	Install runtime shims so EMBER written for older LIEF releases runs on LIEF >= 0.12.
@@ -8,7 +22,13 @@ def apply_ember_lief_shims() -> None:
 	- Map legacy exception names (e.g., lief.bad_format) to the modern lief.lief_errors.*
 	- Quiet LIEF logger by default to avoid overhead on large/malformed binaries.
 	- Provide minimal attribute back-compat where feasible.
+
+	Idempotent: the shims are installed once per process and later calls return immediately.
 	"""
+	global _APPLIED
+	if _APPLIED:
+		return
+	_APPLIED = True
 	try:
 		import lief  # type: ignore
 		# Configure logger (quiet by default). If LEVEL is not present, ignore.
@@ -22,16 +42,7 @@ def apply_ember_lief_shims() -> None:
 		# Modern LIEF exposes typed errors under lief.lief_errors
 		try:
 			errors = getattr(lief, "lief_errors")
-			_legacy_to_modern: dict[str, str] = {
-				"bad_format": "file_format_error",
-				"bad_file": "file_error",
-				"pe_error": "parsing_error",
-				"parser_error": "parsing_error",
-				"read_out_of_bound": "read_out_of_bound",
-				"not_implemented": "not_implemented",
-				"not_found": "file_not_found",
-			}
-			for legacy_name, modern_name in _legacy_to_modern.items():
+			for legacy_name, modern_name in _LEGACY_TO_MODERN:
 				if not hasattr(lief, legacy_name):
 					modern_exc = getattr(errors, modern_name, Exception)
 					setattr(lief, legacy_name, modern_exc)
@@ -39,15 +50,7 @@ def apply_ember_lief_shims() -> None:
 			# Fallback: synthesize Exception classes so try/except in EMBER still works
 			class _DummyException(Exception):
 				pass
-			for legacy_name in (
-				"bad_format",
-				"bad_file",
-				"pe_error",
-				"parser_error",
-				"read_out_of_bound",
-				"not_implemented",
-				"not_found",
-			):
+			for legacy_name, _ in _LEGACY_TO_MODERN:
 				if not hasattr(lief, legacy_name):
 					setattr(lief, legacy_name, _DummyException)
 
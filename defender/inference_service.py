@@ -1,11 +1,34 @@
 import os
 import sys
 import json
+import threading
 import numpy as np
 
-# Apply runtime compatibility shims (modeled after test_ember_simple_fix)
+# Size of the DOS header; anything shorter (or without the MZ magic) cannot be a PE file
+_MIN_PE_SIZE = 64
+
+_FIXES_APPLIED = False
+_EXTRACTOR = None
+# Reentrant: _get_extractor holds it while calling apply_runtime_fixes
+_INIT_LOCK = threading.RLock()
+
+
 def apply_runtime_fixes():
-    # Install EMBER↔LIEF shims (exception mapping, logger level, minor attribute compat)
+    # The patches wrap library methods in place, so they must run exactly once per process, and
+    # concurrent callers must wait until they are fully installed before extracting features
+    global _FIXES_APPLIED
+    if _FIXES_APPLIED:
+        return
+    with _INIT_LOCK:
+        if not _FIXES_APPLIED:
+            _install_runtime_fixes()
+            _FIXES_APPLIED = True
+
+
+# Apply runtime compatibility shims (modeled after test_ember_simple_fix)
+def _install_runtime_fixes():
+    # Install EMBER↔LIEF shims (exception mapping, logger level, minor attribute compat).
+    # The legacy exception-name table lives only in ember_compat.
     try:
         from defender.ember_compat import apply_ember_lief_shims  # type: ignore
         apply_ember_lief_shims()
@@ -14,46 +37,6 @@ def apply_runtime_fixes():
     import numpy as _np
     if not hasattr(_np, 'int'):
         _np.int = int  # type: ignore[attr-defined]
-    try:
-        import lief as _lief
-        # Comprehensive LIEF compatibility mapping for EMBER
-        if hasattr(_lief, 'lief_errors'):
-            _lief.bad_format = _lief.lief_errors.file_format_error
-            _lief.bad_file = _lief.lief_errors.file_error
-            _lief.pe_error = _lief.lief_errors.parsing_error
-            _lief.parser_error = _lief.lief_errors.parsing_error
-            _lief.read_out_of_bound = _lief.lief_errors.read_out_of_bound
-            _lief.not_implemented = _lief.lief_errors.not_implemented
-            _lief.not_found = _lief.lief_errors.file_not_found
-        else:
-            # Fallback for newer LIEF versions - create dummy exceptions
-            class DummyException(Exception):
-                pass
-            _lief.bad_format = DummyException("Bad format")
-            _lief.bad_file = DummyException("Bad file")
-            _lief.pe_error = DummyException("PE error")
-            _lief.parser_error = DummyException("Parser error")
-            _lief.read_out_of_bound = DummyException("Read out of bound")
-            _lief.not_implemented = DummyException("Not implemented")
-            _lief.not_found = DummyException("Not found")
-        
-        # Additional compatibility fixes for newer LIEF versions
-        if not hasattr(_lief, 'bad_format'):
-            _lief.bad_format = Exception("Bad format")
-        if not hasattr(_lief, 'bad_file'):
-            _lief.bad_file = Exception("Bad file")
-        if not hasattr(_lief, 'pe_error'):
-            _lief.pe_error = Exception("PE error")
-        if not hasattr(_lief, 'parser_error'):
-            _lief.parser_error = Exception("Parser error")
-        if not hasattr(_lief, 'read_out_of_bound'):
-            _lief.read_out_of_bound = Exception("Read out of bound")
-        if not hasattr(_lief, 'not_implemented'):
-            _lief.not_implemented = Exception("Not implemented")
-        if not hasattr(_lief, 'not_found'):
-            _lief.not_found = Exception("Not found")
-    except Exception:
-        pass
     try:
         from sklearn.feature_extraction._hash import FeatureHasher as _FH
         _orig = _FH.transform
@@ -89,17 +72,25 @@ def apply_runtime_fixes():
         pass
 
 
-def extract_features_from_exe(exe_path: str) -> np.ndarray:
+def _get_extractor():
     """
-    Extract a (1, 2381) feature vector from a Windows PE executable using Ember.
+    Return the process-wide EMBER PEFeatureExtractor, creating it on first use.
     """
-    apply_runtime_fixes()
-    from ember.features import PEFeatureExtractor
+    global _EXTRACTOR
+    if _EXTRACTOR is None:
+        with _INIT_LOCK:
+            if _EXTRACTOR is None:
+                apply_runtime_fixes()
+                from ember.features import PEFeatureExtractor
+                _EXTRACTOR = PEFeatureExtractor()
+    return _EXTRACTOR
 
-    with open(exe_path, "rb") as f:
-        bytez = f.read()
-    
-    extractor = PEFeatureExtractor()
+
+def _extract_from_bytes(bytez: bytes) -> np.ndarray:
+    """
+    Extract a (1, 2381) feature vector from the raw bytes of a Windows PE executable using Ember.
+    """
+    extractor = _get_extractor()
     vec = extractor.feature_vector(bytez)
     
     if vec is None:
@@ -113,13 +104,29 @@ def extract_features_from_exe(exe_path: str) -> np.ndarray:
     return arr
 
 
-def score_exe(exe_path: str, threshold: float = 0.5) -> dict:
+def extract_features_from_exe(exe_path: str) -> np.ndarray:
+    """
+    Extract a (1, 2381) feature vector from a Windows PE executable using Ember.
+    """
+    with open(exe_path, "rb") as f:
+        bytez = f.read()
+    return _extract_from_bytes(bytez)
+
+
+def score_bytes(pe_bytes: bytes, threshold: float = 0.5) -> dict:
+    # Not a PE file: skip EMBER/LIEF entirely and report benign
+    if len(pe_bytes) < _MIN_PE_SIZE or pe_bytes[:2] != b"MZ":
+        return {
+            "prob_malware": 0.0,
+            "label": 0,
+            "threshold": threshold,
+        }
     try:
         # Import prediction functions
-        from defender.models.predict_xgb import predict_proba
+        from defender.models.predict_xgb import predict_proba_batched
         
-        X = extract_features_from_exe(exe_path)
-        prob = float(predict_proba(X)[0])
+        X = _extract_from_bytes(pe_bytes)
+        prob = predict_proba_batched(X[0])
         label = int(prob >= threshold)
         return {
             "prob_malware": prob,
@@ -131,6 +138,15 @@ def score_exe(exe_path: str, threshold: float = 0.5) -> dict:
         return {"label": 0}
 
 
+def score_exe(exe_path: str, threshold: float = 0.5) -> dict:
+    try:
+        with open(exe_path, "rb") as f:
+            pe_bytes = f.read()
+    except Exception:
+        return {"label": 0}
+    return score_bytes(pe_bytes, threshold=threshold)
+
+
 def _cli():
     import sys
     if len(sys.argv) < 2:
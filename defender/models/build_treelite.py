@@ -0,0 +1,45 @@
+import os
+import sys
+
+try:
+    import xgboost as xgb
+except ImportError as exc:
+    raise SystemExit("xgboost is not installed. Install with: pip install xgboost") from exc
+
+try:
+    import treelite
+except ImportError as exc:
+    raise SystemExit('treelite is not installed. Install with: pip install "treelite<4" "treelite_runtime<4"') from exc
+
+if not hasattr(treelite.Model, "export_lib"):
+    # Treelite 4.0 moved code generation to tl2cgen and stopped publishing treelite_runtime
+    raise SystemExit(f'treelite {treelite.__version__} is not supported. Install with: pip install "treelite<4" "treelite_runtime<4"')
+
+# Run as a script, this directory is on sys.path; share the model-selection rule with the server
+from predict_xgb import default_model_path
+
+
+def build(model_path: str, lib_path: str, toolchain: str = "gcc") -> None:
+    booster = xgb.Booster()
+    booster.load_model(model_path)
+    # Compile only the trees predict_xgb would use (best_iteration when early stopping was enabled)
+    best_it = getattr(booster, "best_iteration", None)
+    if isinstance(best_it, int) and best_it >= 0:
+        booster = booster[: best_it + 1]
+    model = treelite.Model.from_xgboost(booster)
+    model.export_lib(toolchain=toolchain, libpath=lib_path, params={"parallel_comp": 16}, verbose=True)
+    print(f"Saved compiled predictor to: {lib_path}")
+
+
+def _cli():
+    # Usage: python defender/models/build_treelite.py [model_path] [lib_path]
+    # Run once at deploy time, after training; predict_xgb picks up the library when present.
+    model_path = sys.argv[1] if len(sys.argv) >= 2 else default_model_path()
+    lib_path = sys.argv[2] if len(sys.argv) >= 3 else os.path.join("defender", "models", "xgb.so")
+    if not os.path.exists(model_path):
+        raise SystemExit(f"Model not found at {model_path}. Train with train_xgb.py first.")
+    build(model_path, lib_path, toolchain=os.environ.get("TREELITE_TOOLCHAIN", "gcc"))
+
+
+if __name__ == "__main__":
+    _cli()
@@ -1,5 +1,8 @@
 import os
 import sys
+import time
+import queue
+import threading
 import numpy as np
 
 try:
@@ -10,35 +13,152 @@ except ImportError as exc:
 
 _CACHED_BOOSTER = None
 _MODEL_PATH = os.path.join("defender", "models", "xgb_model.json")
+# Binary UBJSON copy written by train_xgb.py; smaller and faster to load than JSON
+_UBJ_MODEL_PATH = os.path.join("defender", "models", "xgb_model.ubj")
+# Optional Treelite-compiled predictor built by build_treelite.py
+_TREELITE_LIB_PATH = os.path.join("defender", "models", "xgb.so")
+_CACHED_PREDICTOR = None
+# Batches smaller than this are scored with inplace_predict (no DMatrix copy)
+_INPLACE_MAX_ROWS = 32
+
+# Dynamic batching of concurrent single-sample requests (see predict_proba_batched)
+_BATCH_MAX_SIZE = int(os.environ.get("XGB_BATCH_MAX_SIZE", "32"))
+# 0 (default) flushes whatever is already queued; > 0 opts in to waiting for more requests
+_BATCH_MAX_WAIT = float(os.environ.get("XGB_BATCH_MAX_WAIT_MS", "0")) / 1000.0
+_BATCH_QUEUE = None
+_BATCH_LOCK = threading.Lock()
+
+
+def _is_up_to_date(derived_path: str, source_path: str) -> bool:
+    """
+    True when derived_path exists and is not older than source_path (or source_path is absent).
+    Used so derived artifacts (.ubj copy, compiled library) never shadow a newer model.
+    """
+    if not os.path.exists(derived_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(derived_path) >= os.path.getmtime(source_path)
+
+
+def default_model_path() -> str:
+    """
+    Path of the default model: the binary .ubj copy when it is at least as new as the JSON model,
+    otherwise the JSON model (e.g. after a pull updated xgb_model.json but left a stale .ubj behind).
+    """
+    return _UBJ_MODEL_PATH if _is_up_to_date(_UBJ_MODEL_PATH, _MODEL_PATH) else _MODEL_PATH
 
 
 def load_booster(model_path: str = None) -> xgb.Booster:
     global _CACHED_BOOSTER
     if _CACHED_BOOSTER is not None:
         return _CACHED_BOOSTER
-    path = model_path or _MODEL_PATH
+    path = model_path or default_model_path()
     if not os.path.exists(path):
         raise FileNotFoundError(f"Model not found at {path}. Train with train_xgb.py first.")
     booster = xgb.Booster()
     booster.load_model(path)
+    # Single-sample latency is dominated by thread wakeup, so predict single-threaded by default
+    booster.set_param({"nthread": int(os.environ.get("XGB_PREDICT_NTHREAD", "1"))})
     _CACHED_BOOSTER = booster
     return booster
 
 
+def load_treelite_predictor():
+    """
+    Return the Treelite predictor for the default model, or None when treelite_runtime, the
+    compiled library or the model is missing, or the library is older than the model it was built from.
+    """
+    global _CACHED_PREDICTOR
+    if _CACHED_PREDICTOR is None:
+        _CACHED_PREDICTOR = False
+        model_path = default_model_path()
+        # Without the model there is nothing to check the library's freshness against
+        if os.path.exists(model_path) and _is_up_to_date(_TREELITE_LIB_PATH, model_path):
+            try:
+                import treelite_runtime
+                _CACHED_PREDICTOR = treelite_runtime.Predictor(
+                    _TREELITE_LIB_PATH, nthread=int(os.environ.get("XGB_PREDICT_NTHREAD", "1"))
+                )
+            except Exception:
+                pass
+    return _CACHED_PREDICTOR or None
+
+
 def predict_proba(features: np.ndarray, model_path: str = None) -> np.ndarray:
     if features.ndim != 2:
         raise ValueError(f"features must be 2D (n_samples, n_features); got shape {features.shape}")
     if features.dtype != np.float32:
         features = features.astype(np.float32, copy=False)
+    if model_path is None:
+        predictor = load_treelite_predictor()
+        if predictor is not None:
+            import treelite_runtime
+            # Treelite squeezes its output (0-d for a single row); keep the (n_samples,) contract
+            probs = predictor.predict(treelite_runtime.DMatrix(features))
+            return np.asarray(probs, dtype=np.float32).reshape(features.shape[0])
     booster = load_booster(model_path)
-    dmat = xgb.DMatrix(features)
     # Use best_iteration when available
     best_it = getattr(booster, "best_iteration", None)
     if isinstance(best_it, int) and best_it >= 0:
-        probs = booster.predict(dmat, iteration_range=(0, best_it + 1))
+        iteration_range = (0, best_it + 1)
     else:
-        probs = booster.predict(dmat)
-    return probs
+        iteration_range = (0, 0)
+    if features.shape[0] < _INPLACE_MAX_ROWS:
+        # Consumes the contiguous float32 array directly, skipping DMatrix construction
+        features = np.ascontiguousarray(features)
+        return booster.inplace_predict(features, iteration_range=iteration_range)
+    dmat = xgb.DMatrix(features)
+    return booster.predict(dmat, iteration_range=iteration_range)
+
+
+def _batch_worker(q: queue.Queue) -> None:
+    while True:
+        # Block for the first request, then take whatever else is already queued (waiting for more
+        # only when XGB_BATCH_MAX_WAIT_MS is set), so a lone request is never delayed by default
+        items = [q.get()]
+        deadline = time.monotonic() + _BATCH_MAX_WAIT
+        while len(items) < _BATCH_MAX_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                items.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            probs = predict_proba(np.stack([vec for vec, _, _ in items]))
+            for i, (_, _, holder) in enumerate(items):
+                holder.append(float(probs[i]))
+        except Exception as exc:
+            for _, _, holder in items:
+                holder.append(exc)
+        for _, done, _ in items:
+            done.set()
+
+
+def _get_batch_queue() -> queue.Queue:
+    global _BATCH_QUEUE
+    with _BATCH_LOCK:
+        if _BATCH_QUEUE is None:
+            q = queue.Queue()
+            threading.Thread(target=_batch_worker, args=(q,), name="xgb-batcher", daemon=True).start()
+            _BATCH_QUEUE = q
+    return _BATCH_QUEUE
+
+
+def predict_proba_batched(vec: np.ndarray) -> float:
+    """
+    Score a single (n_features,) vector, sharing one predict call with other concurrent callers.
+    Blocks until the background batcher has scored the batch containing this vector.
+    """
+    vec = np.asarray(vec, dtype=np.float32).reshape(-1)
+    done = threading.Event()
+    holder = []
+    _get_batch_queue().put((vec, done, holder))
+    done.wait()
+    result = holder[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
 
 
 def predict_label(features: np.ndarray, threshold: float = 0.5, model_path: str = None) -> np.ndarray:
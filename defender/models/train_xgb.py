@@ -1,5 +1,9 @@
 import os
 import sys
+import json
+import struct
+import warnings
+import zipfile
 import numpy as np
 
 try:
@@ -8,9 +12,53 @@ except ImportError as exc:
     raise SystemExit("xgboost is not installed. Install with: pip install xgboost") from exc
 
 
+# Histogram bins; QuantileDMatrix and the training params must agree
+_MAX_BIN = 256
+
+
+def _mmap_npz_member(npz_path: str, name: str):
+    """
+    Memory-map the array stored as <name>.npy inside an .npz without going through the zip decoder.
+    Returns None when the member is missing, compressed, or otherwise not mappable.
+    """
+    with zipfile.ZipFile(npz_path) as zf:
+        try:
+            info = zf.getinfo(name + ".npy")
+        except KeyError:
+            return None
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
+    with open(npz_path, "rb") as f:
+        # Local file header: 30 fixed bytes, then file name and extra field (lengths at offsets 26/28)
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        if len(local_header) != 30 or local_header[:4] != b"PK\x03\x04":
+            return None
+        name_len, extra_len = struct.unpack("<HH", local_header[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+    if dtype.hasobject:
+        return None
+    return np.memmap(npz_path, dtype=dtype, mode="r", shape=shape, order="F" if fortran_order else "C", offset=offset)
+
+
 def load_npz_features(npz_path: str):
     if not os.path.exists(npz_path):
         raise FileNotFoundError(f"Missing file: {npz_path}")
+    # Fast path: map uncompressed members so only the rows actually used (e.g. after subsampling) are read
+    for x_key, y_key in (("X", "y"), ("arr_0", "arr_1")):
+        X = _mmap_npz_member(npz_path, x_key)
+        if X is not None:
+            y = _mmap_npz_member(npz_path, y_key)
+            if y is not None:
+                return X, y
     d = np.load(npz_path)
     try:
         if "X" in d and "y" in d:
@@ -30,16 +78,14 @@ def load_npz_features(npz_path: str):
 
 def compute_basic_metrics(y_true: np.ndarray, y_prob: np.ndarray):
     # Threshold at 0.5 for class predictions
-    y_pred = (y_prob >= 0.5).astype(np.int32)
-    correct = (y_true == y_pred).sum()
+    y_pred = (y_prob >= 0.5).view(np.uint8)
     total = y_true.size
-    accuracy = float(correct) / float(total) if total else 0.0
 
-    # Precision/Recall/F1 (binary, positive=1)
-    tp = int(((y_true == 1) & (y_pred == 1)).sum())
-    fp = int(((y_true == 0) & (y_pred == 1)).sum())
-    fn = int(((y_true == 1) & (y_pred == 0)).sum())
-    tn = int(((y_true == 0) & (y_pred == 0)).sum())
+    # Confusion matrix in one pass: code = 2*y_true + y_pred -> 0=TN, 1=FP, 2=FN, 3=TP (binary, positive=1).
+    # Rows whose label is not 0/1 map past index 3 and are ignored, as before.
+    code = (y_true.astype(np.uint8) << 1) | y_pred
+    tn, fp, fn, tp = (int(c) for c in np.bincount(code, minlength=4)[:4])
+    accuracy = float(tp + tn) / float(total) if total else 0.0
 
     precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
     recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
@@ -50,6 +96,64 @@ def compute_basic_metrics(y_true: np.ndarray, y_prob: np.ndarray):
     return accuracy, precision, recall, f1, fpr, tpr
 
 
+def _subsample_rows(X: np.ndarray, y: np.ndarray, limit: int, rng: np.random.Generator):
+    # Sorted indices make the row gather walk X in file order instead of jumping around
+    idx = np.sort(rng.permutation(X.shape[0])[:limit])
+    X_out = np.empty((limit,) + X.shape[1:], dtype=X.dtype)
+    # mode="clip" avoids the buffered copy np.take makes for out= with mode="raise"; idx is always in range
+    np.take(X, idx, axis=0, out=X_out, mode="clip")
+    return X_out, y[idx]
+
+
+def _to_f32(X: np.ndarray, chunk_rows: int = 8192) -> np.ndarray:
+    """
+    Return X as a C-contiguous float32 array. Already-float32 input is only made contiguous;
+    other dtypes are cast block by block so no full-size intermediate is created.
+    """
+    if X.dtype == np.float32:
+        return np.ascontiguousarray(X)
+    out = np.empty(X.shape, dtype=np.float32)
+    for i in range(0, X.shape[0], chunk_rows):
+        np.copyto(out[i:i + chunk_rows], X[i:i + chunk_rows], casting="same_kind")
+    return out
+
+
+def _build_dmatrices(X_train, y_train, X_val, y_val):
+    """
+    Quantize the training matrix once into a QuantileDMatrix (uint8 bin ids instead of a float copy)
+    and bin the validation set against it. Falls back to DMatrix on XGBoost < 1.7.
+    """
+    if hasattr(xgb, "QuantileDMatrix"):
+        dtrain = xgb.QuantileDMatrix(X_train, label=y_train, max_bin=_MAX_BIN)
+        dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=dtrain)
+    else:
+        dtrain = xgb.DMatrix(X_train, label=y_train)
+        dval = xgb.DMatrix(X_val, label=y_val)
+    return dtrain, dval
+
+
+def _cuda_available() -> bool:
+    """
+    Probe whether this XGBoost build can train on a CUDA device.
+    Set XGB_DEVICE=cpu to skip the probe and force CPU training.
+    """
+    if os.environ.get("XGB_DEVICE", "").lower() == "cpu":
+        return False
+    try:
+        # The "device" parameter only exists from XGBoost 2.0; older releases ignore it with a warning
+        if int(xgb.__version__.split(".")[0]) < 2:
+            return False
+        d = xgb.DMatrix(np.zeros((2, 1), dtype=np.float32), label=np.array([0, 1], dtype=np.float32))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            probe = xgb.train({"device": "cuda", "tree_method": "hist", "verbosity": 0}, d, num_boost_round=1)
+        # Without a visible GPU, XGBoost warns and silently switches the booster back to CPU
+        device = json.loads(probe.save_config())["learner"]["generic_param"].get("device", "cpu")
+        return device.startswith("cuda")
+    except Exception:
+        return False
+
+
 def main():
     test_path = os.path.join("defender", "models", "features", "test-features.npz")
     val_path = os.path.join("defender", "models", "features", "validation-features.npz")
@@ -69,26 +173,19 @@ def main():
     val_limit = int(os.environ.get("XGB_VAL_SAMPLES", "100000"))
 
     if X_train.shape[0] > train_limit:
-        idx = rng.choice(X_train.shape[0], size=train_limit, replace=False)
-        X_train = X_train[idx]
-        y_train = y_train[idx]
+        X_train, y_train = _subsample_rows(X_train, y_train, train_limit, rng)
         print(f"Subsampled train to: {X_train.shape}")
 
     if X_val.shape[0] > val_limit:
-        idx = rng.choice(X_val.shape[0], size=val_limit, replace=False)
-        X_val = X_val[idx]
-        y_val = y_val[idx]
+        X_val, y_val = _subsample_rows(X_val, y_val, val_limit, rng)
         print(f"Subsampled val to: {X_val.shape}")
 
-    # Ensure float32 to lower memory footprint
-    if X_train.dtype != np.float32:
-        X_train = X_train.astype(np.float32, copy=False)
-    if X_val.dtype != np.float32:
-        X_val = X_val.astype(np.float32, copy=False)
+    # Ensure contiguous float32 to lower memory footprint and avoid another copy in XGBoost
+    X_train = _to_f32(X_train)
+    X_val = _to_f32(X_val)
 
-    # XGBoost DMatrix
-    dtrain = xgb.DMatrix(X_train, label=y_train)
-    dval = xgb.DMatrix(X_val, label=y_val)
+    # XGBoost (Quantile)DMatrix
+    dtrain, dval = _build_dmatrices(X_train, y_train, X_val, y_val)
 
     # Simple, reasonable defaults
     params = {
@@ -99,9 +196,14 @@ def main():
         "subsample": 0.8,
         "colsample_bytree": 0.8,
         "tree_method": "hist",  # fast, memory friendly
-        # "device": "cuda",  # uncomment if CUDA available
-        "nthread": int(os.environ.get("XGB_NTHREAD", str(os.cpu_count() or 4))),
+        "max_bin": _MAX_BIN,
     }
+    if _cuda_available():
+        # GPU histogram construction; nthread does not apply on the device
+        params["device"] = "cuda"
+    else:
+        params["nthread"] = int(os.environ.get("XGB_NTHREAD", str(os.cpu_count() or 4)))
+    print(f"Training device: {params.get('device', 'cpu')}")
 
     evals = [(dtrain, "train"), (dval, "validation")]
     print("Training XGBoost ... (this may take a while)")
@@ -133,6 +235,10 @@ def main():
     out_path = os.path.join("defender", "models", "xgb_model.json")
     booster.save_model(out_path)
     print(f"Saved model to: {out_path}")
+    # Binary UBJSON copy, preferred by predict_xgb.load_booster when present
+    ubj_path = os.path.splitext(out_path)[0] + ".ubj"
+    booster.save_model(ubj_path)
+    print(f"Saved model to: {ubj_path}")
 
 
 if __name__ == "__main__":
@@ -146,9 +252,10 @@ if __name__ == "__main__":
             return load_npz_features(p)
         X_train, y_train = _load_override(train_npz)
         X_val, y_val = _load_override(val_npz)
+        X_train = _to_f32(X_train)
+        X_val = _to_f32(X_val)
 
-        dtrain = xgb.DMatrix(X_train, label=y_train)
-        dval = xgb.DMatrix(X_val, label=y_val)
+        dtrain, dval = _build_dmatrices(X_train, y_train, X_val, y_val)
         params = {
             "objective": "binary:logistic",
             "eval_metric": ["auc", "logloss"],
@@ -157,10 +264,17 @@ if __name__ == "__main__":
             "subsample": 0.8,
             "colsample_bytree": 0.8,
             "tree_method": "hist",
+            "max_bin": _MAX_BIN,
         }
+        if _cuda_available():
+            params["device"] = "cuda"
         evals = [(dtrain, "train"), (dval, "validation")]
         booster = xgb.train(params=params, dtrain=dtrain, num_boost_round=200, evals=evals, early_stopping_rounds=20, verbose_eval=25)
-        val_probs = booster.predict(dval, iteration_range=(0, booster.best_ntree_limit))
+        best_it = getattr(booster, "best_iteration", None)
+        if isinstance(best_it, int) and best_it >= 0:
+            val_probs = booster.predict(dval, iteration_range=(0, best_it + 1))
+        else:
+            val_probs = booster.predict(dval)
         acc, prec, rec, f1, fpr, tpr = compute_basic_metrics(y_val.astype(np.int32), val_probs)
         print(f"Validation accuracy: {acc:.4f}")
         print(f"Validation precision: {prec:.4f}")
@@ -170,6 +284,8 @@ if __name__ == "__main__":
         print(f"Validation TPR (threshold=0.5): {tpr:.4f}")
         booster.save_model("xgb_model.json")
         print("Saved model to xgb_model.json")
+        booster.save_model("xgb_model.ubj")
+        print("Saved model to xgb_model.ubj")
     else:
         main()
 
@@ -12,13 +12,22 @@ import sys
 import argparse
 import shutil
 import tempfile
+import concurrent.futures
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
+from test.discovery import iter_executables
+
 
 SERVER_URL = os.environ.get("SERVER_URL", "http://localhost:8080/")
 TIMEOUT = 30
+MAX_WORKERS = 16
+
+# Keep-alive connection pool shared by all worker threads
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
 
 
 def _is_archive(path: Path) -> bool:
@@ -35,25 +44,28 @@ def _extract_if_archive(src: Path) -> Path:
 
 
 def _iter_executables(root: Path) -> Iterable[Path]:
-    exts = {".exe", ".dll", ".sys", ".scr"}
     if root.is_dir():
-        for p in root.rglob("*"):
-            if p.is_file() and (p.suffix.lower() in exts or p.suffix == ""):
-                yield p
+        yield from iter_executables(root)
     elif root.is_file():
         yield root
 
 
 def _score_file(path: Path) -> Tuple[bool, str]:
     try:
+        # Pass the file object so the body is streamed in chunks rather than read into memory.
+        # Empty files go as b"": requests would otherwise add Transfer-Encoding: chunked next to
+        # Content-Length: 0 and the server would wait for a body that never comes.
         with open(path, "rb") as f:
-            data = f.read()
-        resp = requests.post(
-            SERVER_URL,
-            data=data,
-            headers={"Content-Type": "application/octet-stream"},
-            timeout=TIMEOUT,
-        )
+            size = os.fstat(f.fileno()).st_size
+            resp = SESSION.post(
+                SERVER_URL,
+                data=f if size else b"",
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "Content-Length": str(size),
+                },
+                timeout=TIMEOUT,
+            )
         if resp.status_code == 200:
             js = resp.json()
             return True, str(js.get("result", "unknown"))
@@ -62,21 +74,23 @@ def _score_file(path: Path) -> Tuple[bool, str]:
         return False, str(e)
 
 
-def _eval_folder(path: Path, expected: int) -> Tuple[int, int, List[str]]:
+def _eval_folder(path: Path, expected: int, workers: int = MAX_WORKERS) -> Tuple[int, int, List[str]]:
     total = 0
     correct = 0
     errors: List[str] = []
-    for f in _iter_executables(path):
-        total += 1
-        ok, res = _score_file(f)
-        if ok:
-            try:
-                if int(res) == expected:
-                    correct += 1
-            except ValueError:
-                errors.append(f"{f.name}: invalid label '{res}'")
-        else:
-            errors.append(f"{f.name}: {res}")
+    files = list(_iter_executables(path))
+    # Requests are latency-bound, so keep several in flight over pooled connections
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for f, (ok, res) in zip(files, executor.map(_score_file, files)):
+            total += 1
+            if ok:
+                try:
+                    if int(res) == expected:
+                        correct += 1
+                except ValueError:
+                    errors.append(f"{f.name}: invalid label '{res}'")
+            else:
+                errors.append(f"{f.name}: {res}")
     return total, correct, errors
 
 
@@ -84,6 +98,7 @@ def main() -> int:
     ap = argparse.ArgumentParser(description="Evaluate malware/goodware folders against running service")
     ap.add_argument("-m", "--malware", required=True, help="Path to malware folder or archive")
     ap.add_argument("-b", "--benign", required=True, help="Path to benign folder or archive")
+    ap.add_argument("-j", "--workers", type=int, default=MAX_WORKERS, help="Concurrent requests to the service")
     args = ap.parse_args()
 
     mal_src = Path(args.malware)
@@ -106,13 +121,13 @@ def main() -> int:
             cleanup.append(ben_path)
 
         print(f"🔴 Evaluating malware: {mal_path}")
-        m_total, m_correct, m_err = _eval_folder(mal_path, expected=1)
+        m_total, m_correct, m_err = _eval_folder(mal_path, expected=1, workers=args.workers)
         print(f"  Malware: {m_correct}/{m_total} correct")
         if m_err:
             print(f"  Errors (first 5): {', '.join(m_err[:5])}")
 
         print(f"🟢 Evaluating benign: {ben_path}")
-        b_total, b_correct, b_err = _eval_folder(ben_path, expected=0)
+        b_total, b_correct, b_err = _eval_folder(ben_path, expected=0, workers=args.workers)
         print(f"  Benign: {b_correct}/{b_total} correct")
         if b_err:
             print(f"  Errors (first 5): {', '.join(b_err[:5])}")
@@ -0,0 +1,31 @@
+"""
+Executable discovery shared by python -m test, test_local.py and test_docker.py.
+"""
+import os
+from pathlib import Path
+from typing import Iterator
+
+EXECUTABLE_EXTS = {".exe", ".dll", ".sys", ".scr", ""}
+
+
+def iter_executables(root: Path) -> Iterator[Path]:
+    """
+    Yield executable-like files under root in a single os.scandir walk.
+    Files with a traditional executable extension or no extension at all are included.
+    Unreadable directories are skipped rather than aborting the walk; symlinked directories are not followed.
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in EXECUTABLE_EXTS:
+                        yield Path(entry.path)
+                except OSError:
+                    continue
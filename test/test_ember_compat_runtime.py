@@ -1,6 +1,8 @@
 import os
 import sys
 import argparse
+import functools
+import concurrent.futures
 import numpy as np
 
 
@@ -58,10 +60,26 @@ def _iter_candidate_files(path: str):
 		yield path
 
 
+def _check_one(fpath: str, expected_dim: int) -> tuple[str, str]:
+	"""Extract one file and return (status, message); top-level so it pickles for the process pool."""
+	# Use project extractor (ensures same runtime fixes)
+	from defender.inference_service import extract_features_from_exe
+	try:
+		X = extract_features_from_exe(fpath)
+		if X.shape != (1, expected_dim):
+			return "FAIL", f"FAIL: {fpath} -> shape {X.shape}, expected (1,{expected_dim})"
+		if not np.all(np.isfinite(X)):
+			return "FAIL", f"FAIL: {fpath} -> non-finite values in vector"
+		return "OK", f"OK:   {fpath} -> (1,{expected_dim})"
+	except Exception as exc:
+		return "ERROR", f"ERROR: {fpath} -> {exc}"
+
+
 def main():
 	parser = argparse.ArgumentParser(description="Validate ember_compat and feature vector alignment")
 	parser.add_argument("input", help="Path to PE file or directory of files to test")
 	parser.add_argument("--val-npz", dest="val_npz", default=os.path.join("defender", "models", "features", "validation-features.npz"), help="Path to validation-features.npz")
+	parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Number of worker processes for feature extraction")
 	args = parser.parse_args()
 
 	# Install shims and verify legacy names exist
@@ -80,33 +98,23 @@ def main():
 	X_val = np.asarray(val[feat_k])
 	expected_dim = int(X_val.shape[1])
 
-	# Use project extractor (ensures same runtime fixes)
-	from defender.inference_service import extract_features_from_exe
-
 	files = list(_iter_candidate_files(args.input))
 	if not files:
 		raise SystemExit("No candidate files found to test.")
 
+	# LIEF parsing is CPU-bound and independent per file, so fan out across processes
 	total = 0
 	ok = 0
 	fail = 0
-	for fpath in files:
-		total += 1
-		try:
-			X = extract_features_from_exe(fpath)
-			if X.shape != (1, expected_dim):
-				print(f"FAIL: {fpath} -> shape {X.shape}, expected (1,{expected_dim})")
-				fail += 1
-				continue
-			if not np.all(np.isfinite(X)):
-				print(f"FAIL: {fpath} -> non-finite values in vector")
+	check = functools.partial(_check_one, expected_dim=expected_dim)
+	with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+		for status, message in executor.map(check, files, chunksize=8):
+			total += 1
+			print(message)
+			if status == "OK":
+				ok += 1
+			else:
 				fail += 1
-				continue
-			print(f"OK:   {fpath} -> (1,{expected_dim})")
-			ok += 1
-		except Exception as exc:
-			print(f"ERROR: {fpath} -> {exc}")
-			fail += 1
 
 	print("")
 	print(f"Summary: total={total} ok={ok} fail={fail} expected_dim={expected_dim}")
@@ -0,0 +1,41 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip("xgboost")
+
+from defender.models import predict_xgb  # noqa: E402
+
+
+class _SqueezingPredictor:
+    """Mirrors treelite_runtime 3.x output shaping: reshape((n, -1)).squeeze()."""
+
+    def __init__(self, prob):
+        self.prob = prob
+
+    def predict(self, dmat):
+        n = dmat.data.shape[0]
+        return np.full(n, self.prob, dtype=np.float32).reshape((n, -1)).squeeze()
+
+
+@pytest.fixture
+def treelite_predictor(monkeypatch):
+    runtime = types.ModuleType("treelite_runtime")
+    runtime.DMatrix = lambda data: types.SimpleNamespace(data=data)
+    monkeypatch.setitem(sys.modules, "treelite_runtime", runtime)
+    monkeypatch.setattr(predict_xgb, "_CACHED_PREDICTOR", _SqueezingPredictor(0.989))
+    monkeypatch.setattr(predict_xgb, "load_booster", lambda *a, **k: pytest.fail("XGBoost path used"))
+
+
+@pytest.mark.parametrize("n_rows", [1, 3])
+def test_predict_proba_treelite_returns_one_prob_per_row(treelite_predictor, n_rows):
+    probs = predict_xgb.predict_proba(np.zeros((n_rows, 4), dtype=np.float32))
+
+    assert probs.shape == (n_rows,)
+    np.testing.assert_allclose(probs, 0.989, rtol=1e-6)
+
+
+def test_predict_proba_batched_single_row_through_treelite(treelite_predictor):
+    assert predict_xgb.predict_proba_batched(np.zeros(4, dtype=np.float32)) == pytest.approx(0.989, rel=1e-6)
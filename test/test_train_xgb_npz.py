@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("xgboost")
+
+from defender.models.train_xgb import load_npz_features  # noqa: E402
+
+
+def _make_arrays(fortran: bool = False):
+    rng = np.random.default_rng(0)
+    X = rng.random((64, 7), dtype=np.float32)
+    if fortran:
+        X = np.asfortranarray(X)
+    y = rng.integers(0, 2, size=64).astype(np.int32)
+    return X, y
+
+
+@pytest.mark.parametrize("fortran", [False, True], ids=["c_order", "fortran_order"])
+def test_load_npz_features_memmaps_uncompressed_xy(tmp_path, fortran):
+    X, y = _make_arrays(fortran)
+    path = tmp_path / "features.npz"
+    np.savez(path, X=X, y=y)
+
+    X_loaded, y_loaded = load_npz_features(str(path))
+
+    assert isinstance(X_loaded, np.memmap)
+    assert isinstance(y_loaded, np.memmap)
+    assert X_loaded.flags.f_contiguous == fortran
+    with np.load(path) as d:
+        np.testing.assert_array_equal(X_loaded, d["X"])
+        np.testing.assert_array_equal(y_loaded, d["y"])
+        assert X_loaded.dtype == d["X"].dtype
+
+
+def test_load_npz_features_memmaps_positional_keys(tmp_path):
+    X, y = _make_arrays()
+    path = tmp_path / "features.npz"
+    np.savez(path, X, y)
+
+    X_loaded, y_loaded = load_npz_features(str(path))
+
+    assert isinstance(X_loaded, np.memmap)
+    with np.load(path) as d:
+        np.testing.assert_array_equal(X_loaded, d["arr_0"])
+        np.testing.assert_array_equal(y_loaded, d["arr_1"])
+
+
+def test_load_npz_features_falls_back_for_compressed(tmp_path):
+    X, y = _make_arrays()
+    path = tmp_path / "features.npz"
+    np.savez_compressed(path, X=X, y=y)
+
+    X_loaded, y_loaded = load_npz_features(str(path))
+
+    assert not isinstance(X_loaded, np.memmap)
+    assert not isinstance(y_loaded, np.memmap)
+    with np.load(path) as d:
+        np.testing.assert_array_equal(X_loaded, d["X"])
+        np.testing.assert_array_equal(y_loaded, d["y"])
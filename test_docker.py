@@ -11,6 +11,13 @@ from pathlib import Path
 import concurrent.futures
 from typing import Dict, List, Tuple
 
+# Add project root to path for imports
+project_root = Path(__file__).parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from test.discovery import iter_executables
+
 # Configuration
 DOCKER_URL = "http://localhost:8080"  # Updated to port 8080
 MAX_WORKERS = 4  # Parallel processing
@@ -59,15 +66,19 @@ def test_file(file_path: Path) -> Tuple[bool, str]:
     Returns (success, error_message)
     """
     try:
+        # Stream the file object instead of reading the whole binary into memory.
+        # Empty files go as b"" so requests doesn't add Transfer-Encoding: chunked to Content-Length: 0.
         with open(file_path, 'rb') as f:
-            pe_bytes = f.read()
-        
-        response = requests.post(
-            DOCKER_URL,  # POST to root endpoint
-            data=pe_bytes,
-            headers={'Content-Type': 'application/octet-stream'},
-            timeout=TIMEOUT
-        )
+            size = os.fstat(f.fileno()).st_size
+            response = requests.post(
+                DOCKER_URL,  # POST to root endpoint
+                data=f if size else b"",
+                headers={
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Length': str(size)
+                },
+                timeout=TIMEOUT
+            )
         
         if response.status_code == 200:
             result = response.json()
@@ -89,19 +100,7 @@ def test_folder(folder_path: Path, expected_label: int) -> Dict:
     print(f"Testing {folder_path.name} ({'malware' if expected_label == 1 else 'goodware'})...")
     
     # Find all executable files - treat files without extensions as executables
-    exe_files = []
-    
-    # First, get files with traditional executable extensions
-    for ext in ['.exe', '.dll', '.sys', '.scr']:
-        exe_files.extend(folder_path.glob(f"**/*{ext}"))
-    
-    # Then, get all files without extensions (treat as executables)
-    for file_path in folder_path.glob("**/*"):
-        if file_path.is_file() and not file_path.suffix:  # No extension
-            exe_files.append(file_path)
-    
-    # Remove duplicates (in case a file has both patterns)
-    exe_files = list(set(exe_files))
+    exe_files = list(iter_executables(folder_path))
     
     if not exe_files:
         return {
@@ -17,6 +17,7 @@ if str(project_root) not in sys.path:
 
 # Import local inference service
 from defender.inference_service import score_exe
+from test.discovery import iter_executables
 
 # Configuration
 MAX_WORKERS = 4  # Parallel processing
@@ -76,19 +77,7 @@ def test_folder(folder_path: Path, expected_label: int) -> Dict:
     print(f"Testing {folder_path.name} ({'malware' if expected_label == 1 else 'goodware'})...")
     
     # Find all executable files - treat files without extensions as executables
-    exe_files = []
-    
-    # First, get files with traditional executable extensions
-    for ext in ['.exe', '.dll', '.sys', '.scr']:
-        exe_files.extend(folder_path.glob(f"**/*{ext}"))
-    
-    # Then, get all files without extensions (treat as executables)
-    for file_path in folder_path.glob("**/*"):
-        if file_path.is_file() and not file_path.suffix:  # No extension
-            exe_files.append(file_path)
-    
-    # Remove duplicates (in case a file has both patterns)
-    exe_files = list(set(exe_files))
+    exe_files = list(iter_executables(folder_path))
     
     if not exe_files:
         return {